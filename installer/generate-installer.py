@@ -1,21 +1,19 @@
 #!/usr/bin/env python3
-import os, platform, shutil, subprocess, sys
+import os, pathlib, platform, shutil, subprocess, sys
 
 # The current version number for llvm-select
 VERSION = '1.0.0'
 
+# The current platform, determined once at startup rather than queried repeatedly
+_PLATFORM = platform.system()
+
 # Reads the contents of a file
 def getFileContents(filename):
-	f = open(filename, 'r')
-	data = f.read()
-	f.close()
-	return data
+	return pathlib.Path(filename).read_text(encoding='utf8')
 
 # Writes the contents of a file
 def putFileContents(filename, data):
-	f = open(filename, 'w', encoding='utf8')
-	f.write(data)
-	f.close()
+	pathlib.Path(filename).write_text(data, encoding='utf8')
 
 # Wrapper for os.makedirs() that deals with the broken behaviour of exist_ok in Python 3.4.0
 def makeDirs(d):
@@ -24,13 +22,31 @@ def makeDirs(d):
 	except FileExistsError:
 		pass
 
+# Places a file in the installer staging directory, without copying its metadata
+# (We hardlink the file where possible, falling back to copying its contents)
+# (If a mode is specified then we always copy the file, since changing the mode of a hardlink would modify the source file)
+def stageFile(source, dest, mode=None):
+	if mode != None:
+		shutil.copyfile(source, dest)
+		os.chmod(dest, mode)
+		return
+	
+	try:
+		os.link(source, dest)
+	except OSError:
+		shutil.copyfile(source, dest)
+
 # Determines if a command succeeded
 def commandSucceeded(command):
+	
+	# If the executable isn't in the system PATH then there is no need to attempt to run it
+	if shutil.which(command[0]) == None:
+		return False
+	
 	try:
-		proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-		(stdout, stderr) = proc.communicate(None)
+		proc = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
 		return True if (proc.returncode == 0) else False
-	except:
+	except OSError:
 		return False
 
 # Verifies that the specified command is available, and prints an error if it is not
@@ -42,7 +58,7 @@ def errorIfNotAvailable(command, versionFlag='--version'):
 
 # Checks that all of the prerequisites are met for generating the installer
 def checkInstallerPrerequisites():
-	if platform.system() == 'Windows':
+	if _PLATFORM == 'Windows':
 		errorIfNotAvailable('makensis', versionFlag='/VERSION')
 	else:
 		errorIfNotAvailable('fpm')		
@@ -59,25 +75,24 @@ def createInstaller():
 	makeDirs(installerDir + '/bin')
 	
 	# Copy llvm-select
-	if platform.system() == 'Windows':
-		shutil.copy2('../llvm-select.py', installerDir + '/bin/llvm-select.py')
-		shutil.copy2('./windows/llvm-select.cmd', installerDir + '/bin/llvm-select.cmd')
+	if _PLATFORM == 'Windows':
+		stageFile('../llvm-select.py', installerDir + '/bin/llvm-select.py')
+		stageFile('./windows/llvm-select.cmd', installerDir + '/bin/llvm-select.cmd')
 		installerScript = getFileContents('./windows/installer.nsi')
 		installerScript = installerScript.replace('__VERSION__', VERSION)
 		putFileContents(installerDir + '/installer.nsi', installerScript)
 	else:
-		shutil.copy2('../llvm-select.py', installerDir + '/bin/llvm-select')
-		subprocess.call(['chmod', '755', './llvm-select'], cwd=installerDir + '/bin')
+		stageFile('../llvm-select.py', installerDir + '/bin/llvm-select', mode=0o755)
 	
 	# Generate the installer package
-	if platform.system() == 'Windows':
+	if _PLATFORM == 'Windows':
 		subprocess.call(['makensis', 'installer.nsi'], cwd=installerDir)
 	else:
 		
 		# Determine the platform-specific arguments for fpm
 		packageType = None
 		platformArgs = []
-		if platform.system() == 'Darwin':
+		if _PLATFORM == 'Darwin':
 			
 			# Under macOS, we need to specify a package identifier prefix
 			packageType = 'osxpkg'
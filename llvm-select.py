@@ -21,22 +21,53 @@
 #  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 #  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 #  SOFTWARE.
-import argparse, glob, os, platform, re, shutil, stat, subprocess, sys, tarfile
+import argparse, concurrent.futures, contextlib, functools, os, pathlib, platform, re, shutil, stat, subprocess, sys, tarfile, tempfile, threading
+
+# The current platform, determined once at startup rather than queried repeatedly
+_PLATFORM = platform.system()
+
+# The pattern for the names of installed library version directories (VERSION-BUILDTYPE)
+_VERSION_DIR_REGEX = re.compile('[0-9]\\..+-(.+)$')
+
+# The pattern for LLVM version strings (MAJOR.MINOR or MAJOR.MINOR.REVISION)
+_VERSION_STRING_REGEX = re.compile('([0-9]+)\\.([0-9]+)(?:\\.([0-9]+))?')
+
+# The minimum version of CMake required for the build process (`cmake --build` with `--parallel` and multiple targets)
+_MINIMUM_CMAKE_VERSION = (3, 15)
+
+# The flags used to make curl retry downloads when it encounters transient errors
+_CURL_RETRY_FLAGS = ['--retry', '5', '--retry-connrefused', '--retry-delay', '2']
+
+# The buffer size used when extracting source tarballs with the Python tarfile library
+_TARFILE_BUFFER_SIZE = 8 * 1024 * 1024
 
 # Exception class for representing when a required command is not available
 class CommandNotAvailableError(Exception):
 	def __init__(self, command):
 		self.command = command
 
+# Exception class for representing when a required command is available, but is older than the required version
+class CommandVersionError(Exception):
+	def __init__(self, command, requiredVersion):
+		self.command = command
+		self.requiredVersion = requiredVersion
+
 # Utility functionality
 class Utility:
 	
+	# Cache of command probe results, so each command is only run once per process
+	_probeCache = {}
+	
+	# The executables that we have determined are not available, so we never attempt to run them
+	_missingCommands = set()
+	
+	# Cache of the version numbers reported by commands
+	_versionCache = {}
+	
 	# Writes the contents of a file
 	@staticmethod
 	def putFileContents(filename, data):
-		f = open(filename, 'w', encoding='utf8')
-		f.write(data)
-		f.close()
+		pathlib.Path(filename).write_text(data, encoding='utf8')
 	
 	# Fix for Windows-related issues in shutil.rmtree() under some versions of Python
 	# From: <https://bitten.edgewall.org/ticket/253>
@@ -55,7 +86,7 @@ class Utility:
 	def removeIfExists(item):
 		if os.path.lexists(item):
 			if os.path.isdir(item):
-				if platform.system() == 'Windows':
+				if _PLATFORM == 'Windows':
 					Utility._rmtree(item)
 				else:
 					shutil.rmtree(item)
@@ -63,33 +94,128 @@ class Utility:
 				os.unlink(item)
 	
 	# Determines if a command can be run successfully
+	# (The result is cached, so subsequent checks for the same command don't spawn a new process)
 	@staticmethod
 	def commandSucceeded(command):
-		try:
-			proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-			(stdout, stderr) = proc.communicate(None)
-			return True if (proc.returncode == 0) else False
-		except:
+		key = tuple(command)
+		if key in Utility._probeCache:
+			return Utility._probeCache[key]
+		
+		# If the executable isn't in the system PATH then there is no need to attempt to run it
+		if command[0] in Utility._missingCommands or shutil.which(command[0]) == None:
+			Utility._missingCommands.add(command[0])
+			Utility._probeCache[key] = False
 			return False
+		
+		try:
+			proc = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+			result = True if (proc.returncode == 0) else False
+		except FileNotFoundError:
+			Utility._missingCommands.add(command[0])
+			result = False
+		except OSError:
+			result = False
+		
+		Utility._probeCache[key] = result
+		return result
 	
 	# Executes a command, and throws an exception if it fails
+	# (When the output is not shown, it is captured in temporary files rather than memory, since builds can produce a lot of it)
 	@staticmethod
 	def runOrFail(command, cwd=None, env=None, input=None, showOutput=False, suppressOutputOnError=False):
-		proc = subprocess.Popen(
-			command,
-			stdout=(subprocess.PIPE if showOutput == False else None),
-			stderr=(subprocess.PIPE if showOutput == False else None),
-			stdin=subprocess.PIPE,
-			universal_newlines=True,
-			cwd=cwd,
-			env=env
-		)
-		(stdout, stderr) = proc.communicate(input)
-		if (proc.returncode != 0):
-			if showOutput == False and suppressOutputOnError == False:
-				print(stdout)
-				print(stderr)
-			raise Exception('Command ' + str(command) + ' failed with exit code ' + str(proc.returncode))
+		with contextlib.ExitStack() as stack:
+			stdoutFile = stack.enter_context(tempfile.TemporaryFile()) if showOutput == False else None
+			stderrFile = stack.enter_context(tempfile.TemporaryFile()) if showOutput == False else None
+			proc = subprocess.Popen(
+				command,
+				stdout=stdoutFile,
+				stderr=stderrFile,
+				stdin=subprocess.PIPE,
+				cwd=cwd,
+				env=env
+			)
+			proc.communicate(input.encode('utf8') if input != None else None)
+			if (proc.returncode != 0):
+				if showOutput == False and suppressOutputOnError == False:
+					for outputFile in [stdoutFile, stderrFile]:
+						outputFile.seek(0)
+						print(outputFile.read().decode('utf8', 'replace'))
+				raise Exception('Command ' + str(command) + ' failed with exit code ' + str(proc.returncode))
+	
+	# Executes a pipeline of two commands (feeding the output of the first into the second), and throws an exception if either fails
+	# (The producer's error output is captured in a temporary file, since it is only read once both commands have finished)
+	@staticmethod
+	def runPipelineOrFail(producer, consumer, cwd=None, showOutput=False):
+		with tempfile.TemporaryFile() as producerStderrFile:
+			producerProc = subprocess.Popen(
+				producer,
+				stdout=subprocess.PIPE,
+				stderr=(producerStderrFile if showOutput == False else None),
+				cwd=cwd
+			)
+			try:
+				consumerProc = subprocess.Popen(
+					consumer,
+					stdin=producerProc.stdout,
+					stdout=(subprocess.PIPE if showOutput == False else None),
+					stderr=(subprocess.PIPE if showOutput == False else None),
+					universal_newlines=True,
+					cwd=cwd
+				)
+			except:
+				producerProc.stdout.close()
+				producerProc.kill()
+				producerProc.wait()
+				raise
+			
+			# Close our copy of the pipe so the producer receives SIGPIPE if the consumer exits early
+			producerProc.stdout.close()
+			(stdout, stderr) = consumerProc.communicate(None)
+			producerProc.wait()
+			
+			# (We check the consumer first, since if it fails then the producer will typically be killed by SIGPIPE as a result)
+			for (command, proc) in [(consumer, consumerProc), (producer, producerProc)]:
+				if (proc.returncode != 0):
+					if showOutput == False:
+						producerStderrFile.seek(0)
+						print(producerStderrFile.read().decode('utf8', 'replace'))
+						print(stdout)
+						print(stderr)
+					raise Exception('Command ' + str(command) + ' failed with exit code ' + str(proc.returncode))
+	
+	# Retrieves the (major, minor) version number reported by the specified command, or None if the command cannot be run successfully
+	# (If the command doesn't report a recognisable version number, the version is treated as (0, 0))
+	# (The result is cached, and also recorded as the result of the equivalent commandSucceeded() probe)
+	@staticmethod
+	def getCommandVersion(command, versionFlag='--version'):
+		key = (command, versionFlag)
+		if key in Utility._versionCache:
+			return Utility._versionCache[key]
+		
+		version = None
+		if command not in Utility._missingCommands and shutil.which(command) != None:
+			try:
+				proc = subprocess.run([command, versionFlag], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True, check=False)
+				if proc.returncode == 0:
+					match = re.search('([0-9]+)\\.([0-9]+)', proc.stdout)
+					version = (int(match.group(1)), int(match.group(2))) if match != None else (0, 0)
+			except OSError:
+				pass
+		
+		if version == None:
+			Utility._missingCommands.add(command)
+		Utility._probeCache[key] = version != None
+		Utility._versionCache[key] = version
+		return version
+	
+	# Verifies that the specified command is available and at least the specified (major, minor) version, and throws an exception if it is not
+	@staticmethod
+	def errorIfOlderThan(command, minimumVersion, versionFlag='--version'):
+		version = Utility.getCommandVersion(command, versionFlag)
+		if version == None:
+			raise CommandNotAvailableError(command)
+		elif version < minimumVersion:
+			raise CommandVersionError(command, '.'.join([str(v) for v in minimumVersion]))
 	
 	# Verifies that the specified command is available, and throws an exception if it is not
 	@staticmethod
@@ -99,6 +225,10 @@ class Utility:
 
 # Represents all of the information we need for building a specific version of LLVM and Clang
 class LLVMVersionDetails:
+	
+	# Cache of parsed version strings, so each string is only parsed once per process
+	_versionCache = {}
+	
 	def __init__(self, major, minor, revision):
 		self.major = major
 		self.minor = minor
@@ -121,58 +251,71 @@ class LLVMVersionDetails:
 		# For all other releases, all version numbers are properly synchronised
 		return str(self)
 	
-	# Constructs the download URL for the specified tarball source
+	# Retrieves the download URL for the specified tarball source
 	def tarballURL(self, tarballName):
-		if self.tarballs[tarballName] == None:
-			return None
-		
-		return 'http://llvm.org/releases/' + self._tarballVersionString(tarballName) + '/' + self.tarballFilename(tarballName)
+		return self._tarballURLs[tarballName]
 	
-	# Constructs the filename for the specified tarball source
+	# Retrieves the filename for the specified tarball source
 	def tarballFilename(self, tarballName):
-		tarball = self.tarballs[tarballName]
-		if tarball != None:
-			return tarball + '-' + self._tarballVersionString(tarballName) + self.extension
-		
-		return None
+		return self._tarballFilenames[tarballName]
 	
 	@staticmethod
 	def fromVersionString(versionString):
 		
-		# Attempt to parse the version string
-		try:
-			version = list([int(v) for v in versionString.split('.')])
-		except:
-			return None
+		# If we have already parsed this version string then reuse the result
+		if versionString in LLVMVersionDetails._versionCache:
+			return LLVMVersionDetails._versionCache[versionString]
 		
-		# Check that the version string has either two or three components
-		if len(version) < 2 or len(version) > 3:
-			return None
+		details = LLVMVersionDetails._parseVersionString(versionString)
+		LLVMVersionDetails._versionCache[versionString] = details
+		return details
+	
+	# "Private" helper method for fromVersionString()
+	@staticmethod
+	def _parseVersionString(versionString):
 		
-		# Check that none of the components are negative numbers
-		for v in version:
-			if v < 0:
-				return None
+		# Attempt to parse the version string, which must have either two or three non-negative numeric components
+		match = _VERSION_STRING_REGEX.fullmatch(versionString)
+		if match == None:
+			return None
+		major = int(match.group(1))
+		minor = int(match.group(2))
+		revision = int(match.group(3)) if match.group(3) != None else None
 		
 		# The minimum supported version is 2.6, which first added the source tarball for clang
-		if version[0] < 2 or (version[0] == 2 and version[1] < 6):
+		if (major, minor) < (2, 6):
 			return None
 		
 		# 3.4.1 is the first version to include a revision number
-		if len(version) == 3 and (version[0] < 3 or (version[0] == 3 and version[1] < 4)):
+		if revision != None and (major, minor) < (3, 4):
 			return None
 		
 		# All versions after 3.4 require a revision number
-		if len(version) == 2 and (version[0] > 3 or (version[0] == 3 and version[1] > 4)):
+		if revision == None and (major, minor) > (3, 4):
 			return None
 		
 		# Construct an object to represent the details of the parsed version number
-		return LLVMVersionDetails(version[0], version[1], version[2] if len(version) == 3 else None)
+		return LLVMVersionDetails(major, minor, revision)
 	
 	# "Private" method for populating our detail fields based on the version number
 	def _populateFields(self):
 		self.extension = self._determineExtenion()
 		self.tarballs = self._listTarballs()
+		
+		# Determine the (name, archive) pairs for the tarballs that are used by this version
+		self.enabledTarballs = tuple((name, archive) for (name, archive) in self.tarballs.items() if archive != None)
+		
+		# Construct the filename and download URL for each tarball
+		self._tarballFilenames = {}
+		self._tarballURLs = {}
+		for (name, archive) in self.tarballs.items():
+			if archive != None:
+				versionString = self._tarballVersionString(name)
+				self._tarballFilenames[name] = archive + '-' + versionString + self.extension
+				self._tarballURLs[name] = 'http://llvm.org/releases/' + versionString + '/' + self._tarballFilenames[name]
+			else:
+				self._tarballFilenames[name] = None
+				self._tarballURLs[name] = None
 	
 	# Determines the file extension of the source tarballs for this LLVM version
 	def _determineExtenion(self):
@@ -206,12 +349,12 @@ class LLVMVersionDetails:
 		
 		# Version 3.1 and onwards include compiler-rt, which we build under macOS and Linux
 		tarballs['compiler-rt'] = None
-		if platform.system() != 'Windows' and (self.major > 3 or (self.major == 3 and self.minor >= 1)):
+		if _PLATFORM != 'Windows' and (self.major, self.minor) >= (3, 1):
 			tarballs['compiler-rt'] = 'compiler-rt'
 		
 		# Version 3.3 and onwards include libc++, which we only build under macOS
 		tarballs['libcxx'] = None
-		if platform.system() == 'Darwin' and (self.major > 3 or (self.major == 3 and self.minor >= 3)):
+		if _PLATFORM == 'Darwin' and (self.major, self.minor) >= (3, 3):
 			tarballs['libcxx'] = 'libcxx'
 		
 		return tarballs
@@ -222,98 +365,191 @@ class LLVMBuilder:
 	# The list of valid CMake build types for LLVM
 	CmakeBuildTypes = ['Release', 'Debug', 'RelWithDebInfo', 'MinSizeRel']
 	
-	def __init__(self, version):
+	# The locations within the LLVM source tree where the other source tarballs are placed
+	_ComponentDirs = {
+		'clang': 'tools/clang',
+		'compiler-rt': 'projects/compiler-rt',
+		'libcxx': 'projects/libcxx'
+	}
+	
+	# The locks that prevent multiple builders from downloading the same file into the download cache at once
+	_cacheLocks = {}
+	_cacheLocksGuard = threading.Lock()
+	
+	# (If no working directory is specified, the current working directory is used for all build files)
+	def __init__(self, version, workingDir=None):
 		self.version = version
+		self.workingDir = workingDir if workingDir != None else os.getcwd()
 	
 	# Cleans up the files from a build, even if it was interrupted
 	@staticmethod
-	def cleanupFiles(version):
-		for tarballName in version.tarballs:
-			tarball = version.tarballFilename(tarballName)
-			if tarball != None:
-				Utility.removeIfExists(os.getcwd() + '/' + tarball)
-				Utility.removeIfExists(os.getcwd() + '/' + tarballName + '-src')
+	def cleanupFiles(version, workingDir=None):
+		workingDir = workingDir if workingDir != None else os.getcwd()
+		for (tarballName, archive) in version.enabledTarballs:
+			Utility.removeIfExists(workingDir + '/' + version.tarballFilename(tarballName))
+			Utility.removeIfExists(workingDir + '/' + tarballName + '-src')
 	
-	# "Private" method to download and unpack a source tarball
-	def _downloadAndUnpackTarball(self, tarballName, destinationDir, cleanup=True, showProgress=True):
-		
-		# Download the source tarball
-		url = self.version.tarballURL(tarballName)
-		filename = os.getcwd() + '/' + self.version.tarballFilename(tarballName)
-		Utility.runOrFail(['curl', '-f', url, '-o', filename], showOutput=showProgress)
+	# "Private" method to retrieve the lock that guards the specified file in the download cache
+	@staticmethod
+	def _getCacheLock(filename):
+		with LLVMBuilder._cacheLocksGuard:
+			if filename not in LLVMBuilder._cacheLocks:
+				LLVMBuilder._cacheLocks[filename] = threading.Lock()
+			return LLVMBuilder._cacheLocks[filename]
+	
+	# "Private" method to download a source tarball into the download cache, if it isn't already cached
+	# (Downloads are written to a .part file first, so the cache never contains incomplete tarballs,
+	# and an interrupted download is resumed from the .part file the next time it is requested)
+	def _downloadToCache(self, tarballName, cacheDir, showProgress=True):
+		filename = cacheDir + '/' + self.version.tarballFilename(tarballName)
+		with LLVMBuilder._getCacheLock(filename):
+			if os.path.exists(filename) == False:
+				os.makedirs(cacheDir, exist_ok=True)
+				partFile = filename + '.part'
+				Utility.runOrFail(['curl', '-f', '-sS', '-L'] + _CURL_RETRY_FLAGS + ['-C', '-', self.version.tarballURL(tarballName), '-o', partFile], showOutput=showProgress)
+				os.replace(partFile, filename)
+		
+		return filename
+	
+	# "Private" method to unpack a source tarball that has already been downloaded
+	def _unpackTarball(self, filename, destinationDir):
 		
-		# Unpack the tarball
-		# (Under Windows, we use the slower Python tarfile library to avoid a dependency the `tar` command)
-		if platform.system() == 'Windows':
+		# Under Windows, we use the slower Python tarfile library to avoid a dependency the `tar` command
+		if _PLATFORM == 'Windows':
 			with tarfile.open(filename) as tar:
 				
+				# Use a larger buffer when copying file data out of the archive
+				# (Older versions of Python without this attribute will simply ignore it)
+				tar.copybufsize = _TARFILE_BUFFER_SIZE
+				
 				# Determine the top-level directory that the extracted files will reside in
-				rootDir = (tar.getnames())[0]
+				# (We only read the first member here, to avoid an extra pass over the entire archive)
+				rootDir = tar.next().name
 				while (os.path.dirname(rootDir) != ''):
 					rootDir = os.path.dirname(rootDir)
 				
 				# Extract the files and rename the top-level directory
-				tar.extractall()
-				shutil.move(os.getcwd() + '/' + rootDir, destinationDir)
+				# (This continues the same sequential pass over the archive, reusing the member we have already read)
+				tar.extractall(path=self.workingDir)
+				os.rename(self.workingDir + '/' + rootDir, destinationDir)
 		else:
 			os.makedirs(destinationDir)
-			Utility.runOrFail(['tar', '-xvf', filename, '-C', destinationDir, '--strip-components=1'])
+			Utility.runOrFail(['tar', '-xf', filename, '-C', destinationDir, '--strip-components=1'])
+	
+	# "Private" method to download and unpack a source tarball
+	def _downloadAndUnpackTarball(self, tarballName, destinationDir, cleanup=True, showProgress=True):
 		
-		# Perform cleanup
-		if cleanup == True:
-			os.unlink(filename)
+		# Determine the download URL for the source tarball
+		url = self.version.tarballURL(tarballName)
+		
+		# If a download cache directory has been specified, unpack the tarball from the cache
+		cacheDir = os.environ.get('LLVM_SELECT_CACHE', '')
+		if cacheDir != '':
+			filename = self._downloadToCache(tarballName, cacheDir, showProgress=showProgress)
+			self._unpackTarball(filename, destinationDir)
+			
+		elif _PLATFORM == 'Windows':
+			
+			# Download and unpack the tarball
+			filename = self.workingDir + '/' + self.version.tarballFilename(tarballName)
+			Utility.runOrFail(['curl', '-f', '-sS', '-L'] + _CURL_RETRY_FLAGS + [url, '-o', filename], showOutput=showProgress)
+			self._unpackTarball(filename, destinationDir)
+			
+			# Perform cleanup
+			if cleanup == True:
+				os.unlink(filename)
+			
+		else:
+			
+			# Under macOS and Linux, we stream the download directly into `tar` rather than writing the tarball to disk
+			# (Since `tar` cannot detect the compression format when reading from a pipe, we need to specify it explicitly)
+			# (curl's progress meter is disabled so that only its error messages are captured)
+			compressionFlag = '-J' if self.version.extension.endswith('.xz') else '-z'
+			os.makedirs(destinationDir)
+			Utility.runPipelineOrFail(
+				['curl', '-f', '-sS', '-L'] + _CURL_RETRY_FLAGS + [url],
+				['tar', '-x', compressionFlag, '-C', destinationDir, '--strip-components=1'],
+				showOutput=showProgress
+			)
 	
 	# Verifies that all of the prerequisites for building LLVM/Clang from source are met
 	def verifyBuildPrerequisitesMet(self):
 		Utility.errorIfNotAvailable('curl')
-		Utility.errorIfNotAvailable('cmake')
-		if platform.system() != 'Windows':
+		Utility.errorIfOlderThan('cmake', _MINIMUM_CMAKE_VERSION)
+		if _PLATFORM != 'Windows':
 			Utility.errorIfNotAvailable('tar')
 	
 	# Downloads and extracts the LLVM source tarballs
 	def download(self, showProgress=True):
 		
 		# Download, unpack, and remove the source tarballs
-		for tarballName in self.version.tarballs:
-			if self.version.tarballs[tarballName] != None:
-				dir = os.getcwd() + '/' + tarballName + '-src'
-				self._downloadAndUnpackTarball(tarballName, dir, showProgress=showProgress)
-		
-		# Move the extracted directory for clang into place
-		shutil.move(os.getcwd() + '/clang-src', os.getcwd() + '/llvm-src/tools/clang')
-		
-		# Move the extracted directories for the optional components into place
-		if self.version.tarballs['compiler-rt'] != None:
-			shutil.move(os.getcwd() + '/compiler-rt-src', os.getcwd() + '/llvm-src/projects/compiler-rt')
-		if self.version.tarballs['libcxx'] != None:
-			shutil.move(os.getcwd() + '/libcxx-src', os.getcwd() + '/llvm-src/projects/libcxx')
+		# (Each tarball is independent of the others, so we process them all concurrently)
+		# (Since the downloads run concurrently, curl's progress meter is disabled and we just report each download as it starts)
+		with concurrent.futures.ThreadPoolExecutor(max_workers=len(self.version.enabledTarballs)) as executor:
+			futures = {}
+			for (tarballName, archive) in self.version.enabledTarballs:
+				if showProgress == True:
+					print('Downloading ' + self.version.tarballURL(tarballName))
+				dir = self.workingDir + '/' + tarballName + '-src'
+				futures[executor.submit(self._downloadAndUnpackTarball, tarballName, dir, showProgress=showProgress)] = tarballName
+			
+			# Move the extracted directories for clang and the optional components into place as they become available
+			# (This can only happen once the LLVM source tree itself has been extracted)
+			llvmExtracted = False
+			pending = []
+			error = None
+			for future in concurrent.futures.as_completed(futures):
+				if future.exception() != None:
+					error = future.exception() if error == None else error
+					continue
+				
+				tarballName = futures[future]
+				if tarballName == 'llvm':
+					llvmExtracted = True
+				else:
+					pending.append(tarballName)
+				
+				if llvmExtracted == True and error == None:
+					for component in pending:
+						os.rename(self.workingDir + '/' + component + '-src', self.workingDir + '/llvm-src/' + LLVMBuilder._ComponentDirs[component])
+					pending = []
+			
+			# Propagate the first error (if any)
+			if error != None:
+				raise error
 	
 	# Builds LLVM from the extracted source
 	def build(self, buildType, installationRoot, showProgress=True, cleanup=True):
 		
 		# Create the build directory inside of the LLVM root source directory
-		buildDir = os.getcwd() + '/llvm-src/build'
+		buildDir = self.workingDir + '/llvm-src/build'
 		os.makedirs(buildDir)
 		
 		# Determine the installation directory location
 		installDir = installationRoot + os.sep + str(self.version) + '-' + buildType
 		
+		# Determine if we are compiling under Windows with MinGW
+		usingMinGW = _PLATFORM == 'Windows' and Utility.commandSucceeded(['g++', '-v']) == True
+		
+		# Determine the number of parallel jobs to use when building
+		parallelJobs = str(os.cpu_count() or 2)
+		
 		# Determine which CMake generator we are using for the current platform
 		# (Note that Ninja can have some issues under Windows with certain LLVM versions, so we don't use it)
 		# (Note also that under Windows when MinGW g++ is available, we prefer it over cl.exe)
 		cmakeGenerator = 'Unix Makefiles'
-		if platform.system() != 'Windows' and Utility.commandSucceeded(['ninja', '--version']) == True:
+		if _PLATFORM != 'Windows' and Utility.commandSucceeded(['ninja', '--version']) == True:
 			cmakeGenerator = 'Ninja'
-		elif platform.system() == 'Windows' and Utility.commandSucceeded(['g++', '-v']) == False:
+		elif _PLATFORM == 'Windows' and usingMinGW == False:
 			cmakeGenerator = 'NMake Makefiles'
 		
 		# When compiling under Windows with MinGW, running tblgen.exe can fail if libstdc++-6.dll cannot be found,
 		# so we need to build llvm-tblgen and clang-tblgen with flags to statically link against libgcc and libstdc++
 		extraCmakeFlags = []
-		if platform.system() == 'Windows' and Utility.commandSucceeded(['g++', '-v']) == True:
+		if usingMinGW == True:
 			
 			# Create a build directory for tblgen
-			buildDirTG = os.getcwd() + '/llvm-src/build-tblgen'
+			buildDirTG = self.workingDir + '/llvm-src/build-tblgen'
 			os.makedirs(buildDirTG)
 			
 			# Run cmake with the extra flags
@@ -330,8 +566,7 @@ class LLVMBuilder:
 			], cwd=buildDirTG, showOutput=showProgress, env=env)
 			
 			# Build llvm-tblgen and clang-tblgen
-			Utility.runOrFail(['cmake', '--build', '.', '--target', 'llvm-tblgen'], cwd=buildDirTG, showOutput=showProgress)
-			Utility.runOrFail(['cmake', '--build', '.', '--target', 'clang-tblgen'], cwd=buildDirTG, showOutput=showProgress)
+			Utility.runOrFail(['cmake', '--build', '.', '--parallel', parallelJobs, '--target', 'llvm-tblgen', 'clang-tblgen'], cwd=buildDirTG, showOutput=showProgress)
 			
 			# Use the pre-built tblgen during the subsequent compilation
 			extraCmakeFlags = [
@@ -353,12 +588,12 @@ class LLVMBuilder:
 		], cwd=buildDir, showOutput=showProgress)
 		
 		# Perform the build and install it
-		Utility.runOrFail(['cmake', '--build', '.'], cwd=buildDir, showOutput=showProgress)
-		Utility.runOrFail(['cmake', '--build', '.', '--target', 'install'], cwd=buildDir, showOutput=showProgress)
+		# (The install target depends on the default target, so a single invocation performs both steps)
+		Utility.runOrFail(['cmake', '--build', '.', '--parallel', parallelJobs, '--target', 'install'], cwd=buildDir, showOutput=showProgress)
 		
 		# As a follow-up to the tblgen.exe related fix above, copy the correct version of libstdc++-6.dll to the bin directory
 		# (We do it this way for everything other than tblgen.exe because the flags for statically linking libstdc++ can break other parts of the LLVM/Clang compilation)
-		if platform.system() == 'Windows' and Utility.commandSucceeded(['g++', '-v']) == True:
+		if usingMinGW == True:
 			proc = subprocess.Popen(['where', 'g++'], stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
 			(stdout, stderr) = proc.communicate(None)
 			dllPath = os.path.dirname(stdout.strip()) + '/libstdc++-6.dll'
@@ -367,7 +602,7 @@ class LLVMBuilder:
 		
 		# Perform cleanup
 		if cleanup == True:
-			LLVMBuilder.cleanupFiles(self.version)
+			LLVMBuilder.cleanupFiles(self.version, self.workingDir)
 		
 		# Return the installation directory
 		return installDir
@@ -378,21 +613,41 @@ class LLVMSelect:
 	# Determines the installation directory for library versions under the current platform
 	@staticmethod
 	def getInstallationDir():
-		if platform.system() == 'Windows':
+		if _PLATFORM == 'Windows':
 			return os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + '\\versions'
 		else:
 			return '/usr/local/llvm'
 	
-	# Retrieves the list of installed library versions
+	# Retrieves the set of installed library versions
+	# (The result is cached until the installation directory is next modified)
 	@staticmethod
 	def getInstalledVersions():
+		installDir = LLVMSelect.getInstallationDir()
+		try:
+			modified = os.stat(installDir).st_mtime_ns
+		except FileNotFoundError:
+			return frozenset()
+		
+		return LLVMSelect._scanInstalledVersions(installDir, modified)
+	
+	# "Private" helper method for getInstalledVersions()
+	# (We use os.scandir() so that the directory check reuses the file type information from the directory listing)
+	@staticmethod
+	@functools.lru_cache(maxsize=1)
+	def _scanInstalledVersions(installDir, modified):
 		versions = []
-		for item in glob.glob(LLVMSelect.getInstallationDir() + '/*'):
-			itemName = os.path.basename(item)
-			match = re.match('[0-9]\\..+-(.+)', itemName)
-			if os.path.isdir(item) and match != None and match.group(1) in LLVMBuilder.CmakeBuildTypes:
-				versions.append(itemName)
-		return versions
+		buildTypes = set(LLVMBuilder.CmakeBuildTypes)
+		try:
+			with os.scandir(installDir) as entries:
+				for entry in entries:
+					if entry.is_dir() == False:
+						continue
+					match = _VERSION_DIR_REGEX.match(entry.name)
+					if match != None and match.group(1) in buildTypes:
+						versions.append(entry.name)
+		except FileNotFoundError:
+			pass
+		return frozenset(versions)
 	
 	# Removes an existing installed library version
 	@staticmethod
@@ -404,7 +659,7 @@ class LLVMSelect:
 	# Sets the specified library version as the active library version
 	@staticmethod
 	def setActiveLibraryVersion(llvmVersion, buildType):
-		if platform.system() == 'Windows':
+		if _PLATFORM == 'Windows':
 			
 			# Under Windows, write the batch file to call the correct version of llvm-config
 			versionsRoot = LLVMSelect.getInstallationDir()
@@ -458,7 +713,7 @@ if __name__ == '__main__':
 		versions = LLVMSelect.getInstalledVersions()
 		if len(versions) > 0:
 			print('Installed library versions:')
-			print('\n'.join(versions))
+			print('\n'.join(sorted(versions)))
 		else:
 			print('There are no library versions currently installed.')
 		
@@ -485,6 +740,10 @@ if __name__ == '__main__':
 			print('Error: ' + e.command + ' is required for the build process.')
 			print('Please ensure ' + e.command + ' is installed and available in the system PATH.')
 			sys.exit(1)
+		except CommandVersionError as e:
+			print('Error: ' + e.command + ' ' + e.requiredVersion + ' or newer is required for the build process.')
+			print('Please ensure a newer version of ' + e.command + ' is installed and available in the system PATH.')
+			sys.exit(1)
 		except BaseException as e:
 			print(e)
 			sys.exit(1)
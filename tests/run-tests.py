@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
-import os, sys
+import concurrent.futures, os, shutil, sys, tempfile
 from inspect import getsourcefile
 
 # Import the main llvm-select script, using the appropriate calls for our Python version
 # (File location code from here: <http://stackoverflow.com/a/18489147>)
-mainPyFile = os.path.dirname(os.path.dirname(os.path.abspath(getsourcefile(lambda:0)))) + '/llvm-select.py'
+testsDir = os.path.dirname(os.path.abspath(getsourcefile(lambda:0)))
+mainPyFile = os.path.dirname(testsDir) + '/llvm-select.py'
 if sys.version_info >= (3,5):
 	import importlib.util
 	spec = importlib.util.spec_from_file_location('llvm-select', mainPyFile)
@@ -57,32 +58,62 @@ realVersions = [
 	'3.8.0', '3.8.1',
 	'3.9.0'
 ]
-for verString in realVersions:
+
+# (Set the LLVM_SELECT_CACHE environment variable to reuse the downloaded source tarballs across test runs,
+# otherwise the tarballs are downloaded directly, which tests the default code paths)
+
+# Downloads and unpacks the source tarballs for the specified version, returning the output lines and whether the tests passed
+def testRealVersion(verString):
+	output = []
 	version = llvm_select.LLVMVersionDetails.fromVersionString(verString)
 	if version == None:
-		print('Error: rejected real version string "' + verString + '"!')
-		sys.exit(1)
-	
-	print('Version:   ', version)
-	print('Extension: ' + version.extension)
-	print('Tarballs:  ' + str(version.tarballs))
+		output.append('Error: rejected real version string "' + verString + '"!')
+		return (output, False)
 	
-	# Download and unpack the source tarballs for the current version
-	builder = llvm_select.LLVMBuilder(version)
-	builder.download(showProgress=False)
+	output.append('Version:    ' + str(version))
+	output.append('Extension: ' + version.extension)
+	output.append('Tarballs:  ' + str(version.tarballs))
 	
-	# Verify that all of the tarballs downloaded and extracted properly
-	shouldExist = ['./llvm-src/CMakeLists.txt', './llvm-src/tools/clang/CMakeLists.txt']
-	if version.tarballs['compiler-rt'] != None:
-		shouldExist.append('./llvm-src/projects/compiler-rt/CMakeLists.txt')
-	if version.tarballs['libcxx'] != None:
-		shouldExist.append('./llvm-src/projects/libcxx/CMakeLists.txt')
-	for file in shouldExist:
-		if os.path.exists(file) == False:
-			print('Error: tarball extraction didn\'t work properly for LLVM version ' + verString + '!')
-			llvm_select.LLVMBuilder.cleanupFiles(version)
-			sys.exit(1)
-	
-	# Perform cleanup
-	llvm_select.LLVMBuilder.cleanupFiles(version)
-	print('All tests passed for LLVM version `' + verString + '`.\n')
+	# Download and unpack the source tarballs for the current version inside its own working directory
+	workingDir = tempfile.mkdtemp(prefix='llvm-select-test-')
+	try:
+		builder = llvm_select.LLVMBuilder(version, workingDir)
+		builder.download(showProgress=False)
+		
+		# Verify that all of the tarballs downloaded and extracted properly
+		shouldExist = ['/llvm-src/CMakeLists.txt', '/llvm-src/tools/clang/CMakeLists.txt']
+		if version.tarballs['compiler-rt'] != None:
+			shouldExist.append('/llvm-src/projects/compiler-rt/CMakeLists.txt')
+		if version.tarballs['libcxx'] != None:
+			shouldExist.append('/llvm-src/projects/libcxx/CMakeLists.txt')
+		for file in shouldExist:
+			if os.path.exists(workingDir + file) == False:
+				output.append('Error: tarball extraction didn\'t work properly for LLVM version ' + verString + '!')
+				return (output, False)
+		
+		output.append('All tests passed for LLVM version `' + verString + '`.\n')
+		return (output, True)
+		
+	except Exception as e:
+		output.append(str(e))
+		output.append('Error: failed to download the tarballs for LLVM version ' + verString + '!')
+		return (output, False)
+		
+	finally:
+		
+		# Perform cleanup
+		llvm_select.LLVMBuilder.cleanupFiles(version, workingDir)
+		shutil.rmtree(workingDir, ignore_errors=True)
+
+# Test all of the real versions concurrently, reporting the results in order
+# (If any version fails, we cancel the versions that have not yet started, although the ones already running will still finish before we exit)
+executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+futures = [executor.submit(testRealVersion, verString) for verString in realVersions]
+for future in futures:
+	(output, passed) = future.result()
+	print('\n'.join(output))
+	if passed == False:
+		for pending in futures:
+			pending.cancel()
+		sys.exit(1)
+executor.shutdown()